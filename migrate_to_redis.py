@@ -5,7 +5,12 @@ Key Format: TableName:TupleID:Attribute → Value
 Cluster: 4 Masters + 4 Replicas (8 Nodes)
 """
 
+import binascii
+import bisect
+import re
 import sqlite3
+import sys
+from collections import defaultdict
 
 # ============================================================
 # PART 1: RELATIONAL DATABASE
@@ -69,53 +74,231 @@ def create_database():
 # PART 2: REDIS CLUSTER SIMULATOR WITH SHARDING & REPLICATION
 # ============================================================
 
+def crc16(key):
+    # CRC16-CCITT (XMODEM), the same checksum Redis Cluster uses for slots
+    return binascii.crc_hqx(key.encode(), 0)
+
+def key_slot(key):
+    # Hash tags: if the key has a non-empty {...}, only that part is hashed
+    if '{' in key:
+        _, _, rest = key.partition('{')
+        tag, sep, _ = rest.partition('}')
+        if sep and tag:
+            key = tag
+    return crc16(key) % 16384
+
+GLOB_META = re.compile(r'[*?\[\\]')
+
+def glob_to_regex(pattern):
+    # Redis KEYS glob (stringmatchlen): *, ?, [...] with ^ negation and
+    # a-z ranges, and backslash escapes
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == '*':
+            out.append('.*')
+        elif c == '?':
+            out.append('.')
+        elif c == '\\' and i < n:
+            out.append(re.escape(pattern[i]))
+            i += 1
+        elif c == '[':
+            negate = i < n and pattern[i] == '^'
+            if negate:
+                i += 1
+            items = []
+            while i < n and pattern[i] != ']':
+                if pattern[i] == '\\' and i + 1 < n:
+                    items.append(re.escape(pattern[i + 1]))
+                    i += 2
+                elif i + 2 < n and pattern[i + 1] == '-':
+                    lo, hi = sorted((pattern[i], pattern[i + 2]))
+                    items.append(f"{re.escape(lo)}-{re.escape(hi)}")
+                    i += 3
+                else:
+                    items.append(re.escape(pattern[i]))
+                    i += 1
+            i += 1   # closing ']' (an unterminated class runs to the end)
+            if items:
+                out.append(('[^' if negate else '[') + ''.join(items) + ']')
+            else:
+                out.append('.' if negate else '(?!)')
+        else:
+            out.append(re.escape(c))
+    return re.compile(''.join(out), re.DOTALL)
+
+WRONGTYPE = 'WRONGTYPE Operation against a key holding the wrong kind of value'
+
+MASTERS = (('Master-0', 7000), ('Master-1', 7001), ('Master-2', 7002), ('Master-3', 7003))
+REPLICAS = (('Replica-0', 7004), ('Replica-1', 7005), ('Replica-2', 7006), ('Replica-3', 7007))
+
 class RedisCluster:
     def __init__(self):
-        self.data = {}
-        self.sharding_log = {'Master-0':[], 'Master-1':[], 'Master-2':[], 'Master-3':[]}
-    
-    def _crc16(self, key):
-        crc = 0
-        for b in key.encode():
-            crc = ((crc << 5) + crc + b) & 0xFFFF
-        return crc
+        self.data = {}   # key -> (value, slot); value is a str/number or dict (hash)
+        self._sorted_keys = []
+        self._attr_index = defaultdict(list)   # last key segment -> sorted keys
+        self._master_counts = [0] * len(MASTERS)   # keys per master
     
     def _get_slot(self, key):
-        return self._crc16(key) % 16384
+        # Stored entries carry the slot computed when they were written
+        entry = self.data.get(key)
+        return key_slot(key) if entry is None else entry[1]
     
     def _get_master(self, slot):
-        if slot < 4096: return 'Master-0', 7000
-        elif slot < 8192: return 'Master-1', 7001
-        elif slot < 12288: return 'Master-2', 7002
-        else: return 'Master-3', 7003
+        # 16384 slots / 4 masters = 4096 (2**12) slots each
+        return MASTERS[slot >> 12]
     
     def _get_replica(self, master_port):
-        return f'Replica-{master_port-7000}', master_port + 4
+        return REPLICAS[master_port - 7000]
+    
+    def _typed_value(self, key, kind):
+        # Value stored at key, None if absent, TypeError if not of kind
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if not isinstance(entry[0], kind):
+            raise TypeError(WRONGTYPE)
+        return entry[0]
+    
+    def _index_key(self, key, slot):
+        if key not in self.data:
+            bisect.insort(self._sorted_keys, key)
+            attr = sys.intern(key.rpartition(':')[2])
+            bisect.insort(self._attr_index[attr], key)
+            self._master_counts[slot >> 12] += 1
     
     def set(self, key, value):
         slot = self._get_slot(key)
         master, mport = self._get_master(slot)
         replica, rport = self._get_replica(mport)
-        self.data[key] = value
-        self.sharding_log[master].append({'key': key, 'slot': slot})
+        self._index_key(key, slot)
+        self.data[key] = (value, slot)
         return slot, master, mport, replica, rport
     
+    def _index_new_keys(self, keys, slots):
+        # Bulk variant of _index_key: append the batch and re-sort once,
+        # O((N + B) log(N + B)) per batch instead of an O(N) insort per key
+        new = [(k, s) for k, s in zip(keys, slots) if k not in self.data]
+        if not new:
+            return
+        self._sorted_keys.extend(k for k, _ in new)
+        self._sorted_keys.sort()
+        touched = set()
+        for k, _ in new:
+            attr = sys.intern(k.rpartition(':')[2])
+            self._attr_index[attr].append(k)
+            touched.add(attr)
+        for attr in touched:
+            self._attr_index[attr].sort()
+        for _, slot in new:
+            self._master_counts[slot >> 12] += 1
+    
+    def mset(self, mapping):
+        keys = list(mapping)
+        slots = list(map(key_slot, keys))
+        self._index_new_keys(keys, slots)
+        self.data.update(zip(keys, zip(mapping.values(), slots)))
+    
     def get(self, key):
-        return self.data.get(key)
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if isinstance(entry[0], (dict, set)):
+            raise TypeError(WRONGTYPE)
+        return entry[0]
+    
+    def hset(self, key, mapping):
+        fields = self._typed_value(key, dict)
+        slot = self._get_slot(key)
+        master, mport = self._get_master(slot)
+        replica, rport = self._get_replica(mport)
+        if fields is None:
+            self._index_key(key, slot)
+            fields = {}
+            self.data[key] = (fields, slot)
+        fields.update(mapping)
+        return slot, master, mport, replica, rport
+    
+    def hget(self, key, field):
+        fields = self._typed_value(key, dict)
+        return None if fields is None else fields.get(field)
+    
+    def hgetall(self, key):
+        fields = self._typed_value(key, dict)
+        return {} if fields is None else dict(fields)
     
     def keys(self, pattern='*'):
-        if pattern == '*': return list(self.data.keys())
-        prefix = pattern.replace('*', '')
-        return [k for k in self.data.keys() if prefix in k]
+        if pattern == '*': return list(self._sorted_keys)
+        prefix = GLOB_META.split(pattern, 1)[0]
+        if prefix == pattern:
+            # No wildcards: an exact-key check, no range scan
+            return [pattern] if pattern in self.data else []
+        head, _, attr = pattern.rpartition(':')
+        if head.endswith('*') and not GLOB_META.search(attr):
+            # Table:*:attr → one lookup in the attribute index
+            candidates = self._attr_index.get(attr, [])
+        elif prefix:
+            # Prefix* → bisect the range of keys starting with prefix
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            lo = bisect.bisect_left(self._sorted_keys, prefix)
+            hi = bisect.bisect_left(self._sorted_keys, upper)
+            if pattern == prefix + '*':
+                return self._sorted_keys[lo:hi]
+            candidates = self._sorted_keys[lo:hi]
+        else:
+            candidates = self._sorted_keys
+        regex = glob_to_regex(pattern)
+        return [k for k in candidates if regex.fullmatch(k)]
     
     def dbsize(self):
         return len(self.data)
+    
+    def master_counts(self):
+        return list(self._master_counts)
 
 # ============================================================
 # PART 3: MIGRATION WITH SHARDING DEMO
 # ============================================================
 
-def migrate_with_sharding(conn, redis):
+CUSTOMER_ATTRS = ('first_name','last_name','email','phone','city','country')
+PRODUCT_ATTRS = ('product_name','category','price','stock_quantity')
+ORDER_ATTRS = ('customer_id','order_date','status','total_amount')
+
+BATCH_SIZE = 4096
+
+# (key prefix, SQL table, primary key, attributes)
+TABLES = (
+    ('Customer', 'Customer', 'customer_id', CUSTOMER_ATTRS),
+    ('Product', 'Product', 'product_id', PRODUCT_ATTRS),
+    ('Order', 'Order_', 'order_id', ORDER_ATTRS),
+)
+
+def make_migrator(table, attrs):
+    # Generate straight-line code for one table: rows are (pk, *attrs)
+    src = "def migrate(rows):\n    mapping = {}\n    for r in rows:\n"
+    # Implicit concatenation with the repr'd table keeps one BUILD_STRING
+    src += f"        prefix = {table + ':'!r} f'{{r[0]}}:'\n"
+    src += "".join(f"        mapping[prefix + {a!r}] = r[{i}]\n"
+                   for i, a in enumerate(attrs, 1))
+    src += "    return mapping\n"
+    ns = {}
+    exec(compile(src, f"<migrator {table}>", "exec"), ns)
+    return ns['migrate']
+
+MIGRATORS = {table: make_migrator(table, attrs) for table, _, _, attrs in TABLES}
+
+def format_placement(redis, mapping):
+    lines = []
+    for key in mapping:
+        slot = redis._get_slot(key)
+        master, mport = redis._get_master(slot)
+        replica, rport = redis._get_replica(mport)
+        lines.append(f"{key:<40} {slot:>6} {master:<10} {replica}")
+    return lines
+
+def migrate_with_sharding(conn, redis, verbose=True):
     cursor = conn.cursor()
     
     print("="*80)
@@ -123,44 +306,21 @@ def migrate_with_sharding(conn, redis):
     print("Key Format: TableName:TupleID:Attribute → Value")
     print("="*80)
     
-    print(f"\n{'Key':<40} {'Slot':>6} {'Master':<10} {'Replica'}")
-    print("-"*80)
-    
-    # Migrate Customers
-    print("\n--- CUSTOMER TABLE ---")
-    cursor.execute("SELECT * FROM Customer")
-    for row in cursor.fetchall():
-        cid = row[0]
-        attrs = [('first_name',row[1]),('last_name',row[2]),('email',row[3]),
-                 ('phone',row[4]),('city',row[5]),('country',row[6])]
-        for attr, val in attrs:
-            key = f"Customer:{cid}:{attr}"
-            slot, master, mp, replica, rp = redis.set(key, str(val))
-            print(f"{key:<40} {slot:>6} {master:<10} {replica}")
-    
-    # Migrate Products
-    print("\n--- PRODUCT TABLE ---")
-    cursor.execute("SELECT * FROM Product")
-    for row in cursor.fetchall():
-        pid = row[0]
-        attrs = [('product_name',row[1]),('category',row[2]),
-                 ('price',row[3]),('stock_quantity',row[4])]
-        for attr, val in attrs:
-            key = f"Product:{pid}:{attr}"
-            slot, master, mp, replica, rp = redis.set(key, str(val))
-            print(f"{key:<40} {slot:>6} {master:<10} {replica}")
-    
-    # Migrate Orders
-    print("\n--- ORDER TABLE ---")
-    cursor.execute("SELECT * FROM Order_")
-    for row in cursor.fetchall():
-        oid = row[0]
-        attrs = [('customer_id',row[1]),('order_date',row[2]),
-                 ('status',row[3]),('total_amount',row[4])]
-        for attr, val in attrs:
-            key = f"Order:{oid}:{attr}"
-            slot, master, mp, replica, rp = redis.set(key, str(val))
-            print(f"{key:<40} {slot:>6} {master:<10} {replica}")
+    if verbose:
+        sys.stdout.write(f"\n{'Key':<40} {'Slot':>6} {'Master':<10} {'Replica'}\n" + "-"*80 + "\n")
+    
+    for table, sql_table, pk, attrs in TABLES:
+        # Placement lines are buffered and written once per table, not per key
+        log_buf = ["", f"--- {table.upper()} TABLE ---"]
+        cursor.execute(f"SELECT {pk}, {', '.join(attrs)} FROM {sql_table}")
+        # Stream rows in batches rather than materializing the whole table
+        for rows in iter(lambda: cursor.fetchmany(BATCH_SIZE), []):
+            mapping = MIGRATORS[table](rows)
+            redis.mset(mapping)
+            if verbose:
+                log_buf += format_placement(redis, mapping)
+        if verbose:
+            sys.stdout.write("\n".join(log_buf) + "\n")
     
     print(f"\n✅ Migration complete! Total keys: {redis.dbsize()}")
 
@@ -173,13 +333,14 @@ def demo_sharding(redis):
     print("SHARDING DEMONSTRATION - Data Distribution")
     print("="*80)
     
-    total = sum(len(v) for v in redis.sharding_log.values())
-    for m in ['Master-0','Master-1','Master-2','Master-3']:
-        cnt = len(redis.sharding_log[m])
+    counts = redis.master_counts()
+    total = sum(counts)
+    lines = []
+    for (m, port), cnt in zip(MASTERS, counts):
         pct = cnt/total*100
         bar = '█' * int(pct/2)
-        port = 7000 + int(m[-1])
-        print(f"{m} (Port {port}): {cnt:>3} keys ({pct:>5.1f}%) {bar}")
+        lines.append(f"{m} (Port {port}): {cnt:>3} keys ({pct:>5.1f}%) {bar}")
+    print("\n".join(lines))
     
     print(f"\nTotal: {total} keys distributed across 4 master nodes")
     print("\n✅ Sharding is working!")
@@ -196,17 +357,19 @@ def demo_replication(redis):
     
     demo_keys = ['Customer:1:first_name', 'Product:101:product_name', 'Order:1001:status']
     
+    lines = []
     for key in demo_keys:
         slot = redis._get_slot(key)
         master, mport = redis._get_master(slot)
         replica, rport = redis._get_replica(mport)
         value = redis.get(key)
         
-        print(f"\nKey: {key}")
-        print(f"  WRITE  → {master} (Port {mport}): SET {key} = \"{value}\"")
-        print(f"  SYNC   → Data replicated to {replica} (Port {rport})")
-        print(f"  READ   ← {replica} (Port {rport}): GET {key} = \"{value}\"")
-        print(f"  ✅ Replication verified!")
+        lines += [f"\nKey: {key}",
+                  f"  WRITE  → {master} (Port {mport}): SET {key} = \"{value}\"",
+                  f"  SYNC   → Data replicated to {replica} (Port {rport})",
+                  f"  READ   ← {replica} (Port {rport}): GET {key} = \"{value}\"",
+                  "  ✅ Replication verified!"]
+    print("\n".join(lines))
     
     print("\n" + "="*80)
     print("REPLICATION MAPPING")
@@ -234,8 +397,7 @@ def demo_operations(redis):
     
     print("\n--- GET by Value (KEYS pattern) ---")
     print("KEYS Customer:*:email")
-    for k in sorted(redis.keys('Customer:*:email')):
-        print(f"  {k} → {redis.get(k)}")
+    print("\n".join(f"  {k} → {redis.get(k)}" for k in redis.keys('Customer:*:email')))
 
 # ============================================================
 # MAIN
@@ -0,0 +1,125 @@
+import unittest
+
+from migrate_to_redis import RedisCluster, crc16, key_slot, make_migrator
+
+
+class TestSlots(unittest.TestCase):
+    def test_crc16_matches_redis_cluster(self):
+        # Reference value from the Redis Cluster specification
+        self.assertEqual(crc16('123456789'), 0x31C3)
+
+    def test_hash_tag_routes_on_tag_only(self):
+        self.assertEqual(key_slot('{user1000}.following'), key_slot('user1000'))
+        self.assertEqual(key_slot('{user1000}.followers'), key_slot('user1000'))
+
+    def test_empty_hash_tag_hashes_whole_key(self):
+        self.assertEqual(key_slot('foo{}{bar}'), crc16('foo{}{bar}') % 16384)
+
+
+class TestStrings(unittest.TestCase):
+    def test_set_get_and_overwrite(self):
+        r = RedisCluster()
+        r.set('Customer:1:first_name', 'Ahmed')
+        r.set('Customer:1:first_name', 'Ali')
+        self.assertEqual(r.get('Customer:1:first_name'), 'Ali')
+        self.assertIsNone(r.get('missing'))
+        self.assertEqual(r.dbsize(), 1)
+
+    def test_mset(self):
+        r = RedisCluster()
+        r.set('Product:101:price', 1.0)
+        r.mset({'Product:101:price': 4500.0, 'Product:102:price': 150.0})
+        self.assertEqual(r.get('Product:101:price'), 4500.0)
+        self.assertEqual(r.get('Product:102:price'), 150.0)
+        self.assertEqual(r.dbsize(), 2)
+        self.assertEqual(sum(r.master_counts()), 2)
+
+
+class TestHashes(unittest.TestCase):
+    def test_hset_merges_fields(self):
+        r = RedisCluster()
+        r.hset('Customer:1', {'first_name': 'Ahmed'})
+        r.hset('Customer:1', {'city': 'Riyadh'})
+        self.assertEqual(r.hgetall('Customer:1'), {'first_name': 'Ahmed', 'city': 'Riyadh'})
+        self.assertEqual(r.hget('Customer:1', 'city'), 'Riyadh')
+        self.assertIsNone(r.hget('Customer:1', 'email'))
+
+    def test_missing_hash(self):
+        r = RedisCluster()
+        self.assertIsNone(r.hget('Customer:9', 'city'))
+        self.assertEqual(r.hgetall('Customer:9'), {})
+
+    def test_hash_commands_on_string_key(self):
+        r = RedisCluster()
+        r.set('k', 'v')
+        with self.assertRaises(TypeError):
+            r.hset('k', {'f': 1})
+        with self.assertRaises(TypeError):
+            r.hget('k', 'f')
+        with self.assertRaises(TypeError):
+            r.hgetall('k')
+        self.assertEqual(r.get('k'), 'v')
+
+    def test_get_on_hash_key(self):
+        r = RedisCluster()
+        r.hset('Customer:1', {'first_name': 'Ahmed'})
+        with self.assertRaises(TypeError):
+            r.get('Customer:1')
+        self.assertEqual(r.hgetall('Customer:1'), {'first_name': 'Ahmed'})
+
+
+class TestKeys(unittest.TestCase):
+    def setUp(self):
+        self.r = RedisCluster()
+        self.r.mset({
+            'Customer:1:email': 'a@x', 'Customer:2:email': 'b@x',
+            'Customer:1:city': 'Riyadh', 'Product:101:price': 4500.0,
+            'Order:1001:status': 'delivered', 'Order:1002:status': 'shipped',
+        })
+
+    def test_all_keys_sorted(self):
+        self.assertEqual(self.r.keys(), sorted(self.r.keys()))
+        self.assertEqual(len(self.r.keys('*')), 6)
+
+    def test_prefix(self):
+        self.assertEqual(self.r.keys('Customer:1:*'), ['Customer:1:city', 'Customer:1:email'])
+
+    def test_attribute_pattern(self):
+        self.assertEqual(self.r.keys('Customer:*:email'), ['Customer:1:email', 'Customer:2:email'])
+        self.assertEqual(self.r.keys('*:status'), ['Order:1001:status', 'Order:1002:status'])
+
+    def test_glob_metacharacters(self):
+        self.assertEqual(self.r.keys('Cust?mer:2:e*'), ['Customer:2:email'])
+        self.assertEqual(self.r.keys('Order:100[2]:*'), ['Order:1002:status'])
+
+    def test_negated_class(self):
+        self.assertEqual(self.r.keys('Order:100[^1]:*'), ['Order:1002:status'])
+        self.assertEqual(self.r.keys('Order:100[^0-1]:status'), ['Order:1002:status'])
+
+    def test_class_range(self):
+        self.assertEqual(self.r.keys('Customer:[2-1]:email'), ['Customer:1:email', 'Customer:2:email'])
+
+    def test_backslash_escape(self):
+        self.r.set('a*b', 1)
+        self.r.set('axb', 2)
+        self.assertEqual(self.r.keys('a\\*b'), ['a*b'])
+        self.assertEqual(self.r.keys('a*b'), ['a*b', 'axb'])
+
+    def test_exact_key(self):
+        self.assertEqual(self.r.keys('Product:101:price'), ['Product:101:price'])
+        self.assertEqual(self.r.keys('Product:999:price'), [])
+
+
+class TestMigrator(unittest.TestCase):
+    def test_builds_attribute_keys(self):
+        migrate = make_migrator('Product', ('product_name', 'price'))
+        self.assertEqual(migrate([(101, 'Laptop', 4500.0)]),
+                         {'Product:101:product_name': 'Laptop', 'Product:101:price': 4500.0})
+
+    def test_table_name_is_not_spliced_into_source(self):
+        migrate = make_migrator('O\'rder{x}"', ('status',))
+        self.assertEqual(migrate([(1, 'ok')]), {'O\'rder{x}":1:status': 'ok'})
+
+
+if __name__ == '__main__':
+    unittest.main()